@@ -4,7 +4,7 @@ Date: 2025-05-04
 """
 
 from dataclasses import dataclass
-from typing import ClassVar, Self
+from typing import ClassVar, Self, Tuple, cast
 
 from turtle_toolkit.common.config import (
     DATA_ADDRESS_WIDTH,
@@ -13,7 +13,7 @@ from turtle_toolkit.common.config import (
 )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BusValue:
     """Class representing a bus data type.
 
@@ -23,6 +23,27 @@ class BusValue:
 
     value: int
     _bus_width: ClassVar[int] = DATA_WIDTH
+    _mask: ClassVar[int]
+    _pool: ClassVar[Tuple["BusValue", ...]]
+
+    def __init_subclass__(cls) -> None:
+        # Zero-argument super() is unavailable in slotted dataclasses
+        cls._init_pool()
+
+    @classmethod
+    def _init_pool(cls) -> None:
+        """Create the shared instances handed out by of()."""
+        cls._mask = (1 << cls._bus_width) - 1
+        cls._pool = tuple(cls(value) for value in range(cls._mask + 1))
+
+    @classmethod
+    def of(cls, value: int) -> Self:
+        """Return the shared instance for a value, wrapped to the bus width.
+
+        Bus values are immutable, so the same instance can be reused wherever
+        the value is needed instead of allocating a new one.
+        """
+        return cast(Self, cls._pool[value & cls._mask])
 
     def __post_init__(self):
         """Post-initialization to ensure value is within bounds."""
@@ -55,7 +76,7 @@ class BusValue:
             raise ValueError("Invalid slice indices.")
         mask = (1 << (end - start)) - 1
         sliced_value = (self.unsigned_value() >> start) & mask
-        return self.__class__(sliced_value)
+        return self.of(sliced_value)
 
     @staticmethod
     def min_unsigned_value() -> int:
@@ -79,32 +100,27 @@ class BusValue:
 
     def __add__(self, other: Self) -> Self:
         """Add two DataBusValue objects."""
-        return self.__class__(
-            (self.unsigned_value() + other.unsigned_value()) % (2**self._bus_width)
-        )
+        return self.of(self.value + other.value)
 
     def __sub__(self, other: Self) -> Self:
         """Subtract two DataBusValue objects."""
-        return self.__class__(
-            (self.unsigned_value() - other.unsigned_value()) % (2**self._bus_width)
-        )
+        return self.of(self.value - other.value)
 
     def __and__(self, other: Self) -> Self:
         """Bitwise AND of two DataBusValue objects."""
-        return self.__class__(self.unsigned_value() & other.unsigned_value())
+        return self.of(self.value & other.value)
 
     def __or__(self, other: Self) -> Self:
         """Bitwise OR of two DataBusValue objects."""
-        return self.__class__(self.unsigned_value() | other.unsigned_value())
+        return self.of(self.value | other.value)
 
     def __xor__(self, other: Self) -> Self:
         """Bitwise XOR of two DataBusValue objects."""
-        return self.__class__(self.unsigned_value() ^ other.unsigned_value())
+        return self.of(self.value ^ other.value)
 
     def __invert__(self) -> Self:
         """Bitwise NOT of the DataBusValue object."""
-        inverted_value = ~self.unsigned_value() & self.max_unsigned_value()
-        return self.__class__(inverted_value)
+        return self.of(~self.value)
 
     def __str__(self) -> str:
         """String representation of the DataBusValue object."""
@@ -152,6 +168,9 @@ class BusValue:
         return format(self.unsigned_value(), f"0{self._bus_width}b")
 
 
+BusValue._init_pool()
+
+
 class DataBusValue(BusValue):
     """Class representing a data bus value.
 
@@ -159,7 +178,7 @@ class DataBusValue(BusValue):
     specific to data buses.
     """
 
-    pass
+    __slots__ = ()
 
 
 class InstructionAddressBusValue(BusValue):
@@ -169,6 +188,7 @@ class InstructionAddressBusValue(BusValue):
     specific to instruction address buses.
     """
 
+    __slots__ = ()
     _bus_width: ClassVar[int] = INSTRUCTION_ADDRESS_WIDTH
 
 
@@ -179,4 +199,5 @@ class DataAddressBusValue(BusValue):
     specific to data address buses.
     """
 
+    __slots__ = ()
     _bus_width: ClassVar[int] = DATA_ADDRESS_WIDTH
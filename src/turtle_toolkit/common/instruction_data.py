@@ -68,6 +68,9 @@ class RegisterIndex(Enum):
     STATUS = 0b1111
 
 
+# Size of a register array indexed by RegisterIndex value
+NUM_REGISTERS = max(reg.value for reg in RegisterIndex) + 1
+
 NOP_OPCODE_TEXTS = {"NOP"}
 
 HALT_OPCODE_TEXTS = {"HALT"}
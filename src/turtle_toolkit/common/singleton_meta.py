@@ -13,6 +13,10 @@ class SingletonMeta(type):
     _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
+        # Only take the lock while the instance may still need creating
+        instance = cls._instances.get(cls)
+        if instance is not None:
+            return instance
         with cls._lock:
             if cls not in cls._instances:
                 instance = super().__call__(*args, **kwargs)
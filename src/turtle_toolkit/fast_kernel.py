@@ -0,0 +1,214 @@
+"""fast_kernel.py - Integer-only execution kernel for the simulator
+Author: Tom Riley
+Date: 2026-10-15
+"""
+
+from typing import List, MutableSequence, Optional, Tuple
+
+from turtle_toolkit.common.config import (
+    DATA_ADDRESS_WIDTH,
+    DATA_WIDTH,
+    INSTRUCTION_ADDRESS_WIDTH,
+    INSTRUCTION_WIDTH,
+)
+from turtle_toolkit.common.instruction_data import (
+    ArithLogicFunction,
+    BranchCondition,
+    RegisterIndex,
+)
+from turtle_toolkit.modules.decoder import DecodedInstruction, DispatchId
+
+# (dispatch id, register index, data immediate, address immediate,
+#  ALU function, branch condition)
+KernelInstruction = Tuple[int, int, int, int, int, int]
+
+DATA_MASK = (1 << DATA_WIDTH) - 1
+SIGN_BIT = 1 << (DATA_WIDTH - 1)
+INSTRUCTION_ADDRESS_MASK = (1 << INSTRUCTION_ADDRESS_WIDTH) - 1
+INSTRUCTION_BYTES = INSTRUCTION_WIDTH // 8
+DATA_BASE_MASK = (1 << (DATA_ADDRESS_WIDTH - DATA_WIDTH)) - 1
+INSTRUCTION_BASE_MASK = (1 << (INSTRUCTION_ADDRESS_WIDTH - DATA_WIDTH)) - 1
+
+ALU_REG = DispatchId.ALU_REG.value
+ALU_IMM = DispatchId.ALU_IMM.value
+REG_SET = DispatchId.REG_SET.value
+REG_GET = DispatchId.REG_GET.value
+REG_PUT = DispatchId.REG_PUT.value
+LOAD = DispatchId.LOAD.value
+STORE = DispatchId.STORE.value
+BRANCH = DispatchId.BRANCH.value
+JUMP_IMM = DispatchId.JUMP_IMM.value
+JUMP_REL = DispatchId.JUMP_REL.value
+JUMP_ABS = DispatchId.JUMP_ABS.value
+NOP = DispatchId.NOP.value
+
+ADD = ArithLogicFunction.ADD.value
+SUB = ArithLogicFunction.SUB.value
+AND = ArithLogicFunction.AND.value
+OR = ArithLogicFunction.OR.value
+XOR = ArithLogicFunction.XOR.value
+
+ACC = RegisterIndex.ACC.value
+STATUS = RegisterIndex.STATUS.value
+DBAR = RegisterIndex.DBAR.value
+DOFF = RegisterIndex.DOFF.value
+IBAR = RegisterIndex.IBAR.value
+IOFF = RegisterIndex.IOFF.value
+
+# Status register bits
+ZERO = 1 << 0
+POSITIVE = 1 << 1
+CARRY = 1 << 2
+OVERFLOW = 1 << 3
+
+# Status bit tested by each branch condition, and the value that takes the branch
+BRANCH_TESTS = {
+    BranchCondition.ZERO.value: (ZERO, ZERO),
+    BranchCondition.NOT_ZERO.value: (ZERO, 0),
+    BranchCondition.POSITIVE.value: (POSITIVE, POSITIVE),
+    BranchCondition.NEGATIVE.value: (POSITIVE, 0),
+    BranchCondition.CARRY_SET.value: (CARRY, CARRY),
+    BranchCondition.CARRY_CLEARED.value: (CARRY, 0),
+    BranchCondition.OVERFLOW_SET.value: (OVERFLOW, OVERFLOW),
+    BranchCondition.OVERFLOW_CLEARED.value: (OVERFLOW, 0),
+}
+
+
+def encode_instruction(
+    decoded_instruction: DecodedInstruction,
+) -> Optional[KernelInstruction]:
+    """Encode a decoded instruction for the kernel.
+    Returns None if the instruction has to be executed by the simulator."""
+    dispatch_id = decoded_instruction.dispatch_id
+    if dispatch_id in (DispatchId.HALT, DispatchId.INVALID_REG):
+        return None
+    if dispatch_id == DispatchId.REG_PUT and decoded_instruction.register_index in (
+        RegisterIndex.ACC,
+        RegisterIndex.STATUS,
+    ):
+        return None
+    alu_function = decoded_instruction.alu_function
+    return (
+        dispatch_id.value,
+        decoded_instruction.register_index.value,
+        decoded_instruction.immediate_data_value.unsigned_value(),
+        decoded_instruction.immediate_address_value.unsigned_value(),
+        alu_function.value if alu_function is not None else 0,
+        decoded_instruction.branch_condition.value,
+    )
+
+
+def memory_instruction_cycles(fetch_latency: int, memory_latency: int) -> int:
+    """Cycles taken by a load or store that starts at an instruction boundary.
+
+    The data access is requested when the first fetch completes. Every stalled
+    attempt restarts the fetch, so the access is retried every fetch_latency + 1
+    cycles until the data memory has counted down its latency.
+    """
+    retries = -(-memory_latency // (fetch_latency + 1))
+    return fetch_latency + retries * (fetch_latency + 1) + 1
+
+
+def run_kernel(
+    registers: List[int],
+    data_memory: MutableSequence[int],
+    data_written: bytearray,
+    program: List[Optional[KernelInstruction]],
+    pc: int,
+    max_cycles: Optional[int],
+    fetch_latency: int,
+    memory_latency: int,
+) -> Tuple[int, int]:
+    """Execute whole instructions until one can not be run by the kernel.
+
+    registers, data_memory and data_written are updated in place. Execution
+    stops before an instruction that is missing from the program, would load
+    unwritten memory, or would exceed max_cycles.
+
+    Returns:
+        Tuple of cycles executed and the program counter to continue from.
+    """
+    instruction_cycles = fetch_latency + 1
+    memory_cycles = memory_instruction_cycles(fetch_latency, memory_latency)
+    cycles = 0
+    while True:
+        instruction = program[pc]
+        if instruction is None:
+            break
+        dispatch_id, register, data_imm, addr_imm, function, condition = instruction
+        if dispatch_id == LOAD or dispatch_id == STORE:
+            cost = memory_cycles
+        else:
+            cost = instruction_cycles
+        if max_cycles is not None and cycles + cost > max_cycles:
+            break
+
+        next_pc = (pc + INSTRUCTION_BYTES) & INSTRUCTION_ADDRESS_MASK
+        if dispatch_id == ALU_REG or dispatch_id == ALU_IMM:
+            a = registers[ACC]
+            b = registers[register] if dispatch_id == ALU_REG else data_imm
+            carry = 0
+            overflow = 0
+            if function == ADD:
+                result = (a + b) & DATA_MASK
+                if a + b > DATA_MASK:
+                    carry = CARRY
+                if (a & SIGN_BIT) == (b & SIGN_BIT) and (result ^ a) & SIGN_BIT:
+                    overflow = OVERFLOW
+            elif function == SUB:
+                result = (a - b) & DATA_MASK
+                if a < b:
+                    carry = CARRY
+                if (a & SIGN_BIT) != (b & SIGN_BIT) and (result ^ a) & SIGN_BIT:
+                    overflow = OVERFLOW
+            elif function == AND:
+                result = a & b
+            elif function == OR:
+                result = a | b
+            elif function == XOR:
+                result = a ^ b
+            else:
+                result = ~a & DATA_MASK
+            registers[ACC] = result
+            registers[STATUS] = (
+                (ZERO if result == 0 else 0)
+                | (0 if result & SIGN_BIT else POSITIVE)
+                | carry
+                | overflow
+            )
+        elif dispatch_id == REG_GET:
+            registers[ACC] = registers[register]
+        elif dispatch_id == REG_PUT:
+            registers[register] = registers[ACC]
+        elif dispatch_id == REG_SET:
+            registers[ACC] = data_imm
+        elif dispatch_id == BRANCH:
+            bit, taken = BRANCH_TESTS[condition]
+            if registers[STATUS] & bit == taken:
+                next_pc = (pc + addr_imm) & INSTRUCTION_ADDRESS_MASK
+        elif dispatch_id == JUMP_IMM:
+            next_pc = (pc + addr_imm) & INSTRUCTION_ADDRESS_MASK
+        elif dispatch_id == JUMP_REL or dispatch_id == JUMP_ABS:
+            target = ((registers[IBAR] & INSTRUCTION_BASE_MASK) << DATA_WIDTH) | (
+                registers[IOFF]
+            )
+            if dispatch_id == JUMP_REL:
+                next_pc = (pc + target) & INSTRUCTION_ADDRESS_MASK
+            else:
+                next_pc = target
+        elif dispatch_id == LOAD or dispatch_id == STORE:
+            address = ((registers[DBAR] & DATA_BASE_MASK) << DATA_WIDTH) | (
+                registers[DOFF]
+            )
+            if dispatch_id == STORE:
+                data_memory[address] = registers[ACC]
+                data_written[address] = 1
+            elif data_written[address]:
+                registers[ACC] = data_memory[address]
+            else:
+                # Leave the segmentation fault to the simulator
+                break
+
+        cycles += cost
+        pc = next_pc
+    return cycles, pc
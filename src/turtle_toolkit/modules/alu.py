@@ -12,7 +12,7 @@ from turtle_toolkit.modules.base_module import BaseModule
 
 
 class ALUOutputs:
-    result: DataBusValue = DataBusValue(0)
+    result: DataBusValue = DataBusValue.of(0)
     signed_overflow: bool = False
     carry_flag: bool = False
     positive_flag: bool = False
@@ -26,7 +26,9 @@ class ALU(BaseModule):
         function: Optional[ArithLogicFunction],
     ) -> ALUOutputs:
         """Execute the ALU operation based on the inputs."""
-        logger.debug(f"Executing ALU with inputs: {operand_a}, {operand_b}, {function}")
+        logger.debug(
+            "Executing ALU with inputs: %s, %s, %s", operand_a, operand_b, function
+        )
 
         outputs = ALUOutputs()
 
@@ -3,30 +3,137 @@ Author: Tom Riley
 Date: 2025-05-06
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, Generic, Optional, TypeVar
+from array import array
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Generic,
+    Iterator,
+    Optional,
+    Protocol,
+    TypeVar,
+    Union,
+    overload,
+)
 
+from turtle_toolkit.common.data_types import BusValue
 from turtle_toolkit.modules.base_module import BaseModule, BaseModuleState
 
-AddressType = TypeVar("AddressType")
-DataType = TypeVar("DataType")
+
+class MemoryValue(Protocol):
+    """Value that can be stored in a flat memory."""
+
+    def unsigned_value(self) -> int: ...
+
+
+AddressType = TypeVar("AddressType", bound=BusValue)
+DataType = TypeVar("DataType", bound=MemoryValue)
+DefaultType = TypeVar("DefaultType")
+
+
+class FlatMemory(MutableMapping[AddressType, DataType]):
+    """Memory contents stored as flat arrays indexed by unsigned address.
+
+    Values are kept as plain integers in `cells`, and `written` marks which
+    addresses have been written. Unwritten cells always hold zero. The mapping
+    interface converts to and from address and value objects, and iterates in
+    ascending address order.
+    """
+
+    def __init__(
+        self,
+        address_width: int,
+        typecode: str,
+        address_type: Callable[[int], AddressType],
+        value_type: Callable[[int], DataType],
+    ) -> None:
+        size = 1 << address_width
+        self.cells = array(typecode, bytes(size * array(typecode).itemsize))
+        self.written = bytearray(size)
+        self._address_type = address_type
+        self._value_type = value_type
+
+    @overload
+    def get(self, key: AddressType) -> Optional[DataType]: ...
+
+    @overload
+    def get(
+        self, key: AddressType, default: Union[DataType, DefaultType]
+    ) -> Union[DataType, DefaultType]: ...
+
+    def get(
+        self, key: AddressType, default: Optional[DefaultType] = None
+    ) -> Union[DataType, DefaultType, None]:
+        index = key.value
+        if self.written[index]:
+            return self._value_type(self.cells[index])
+        return default
+
+    def __getitem__(self, key: AddressType) -> DataType:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: AddressType, value: DataType) -> None:
+        index = key.value
+        self.cells[index] = value.unsigned_value()
+        self.written[index] = 1
+
+    def __delitem__(self, key: AddressType) -> None:
+        index = key.value
+        if not self.written[index]:
+            raise KeyError(key)
+        self.cells[index] = 0
+        self.written[index] = 0
+
+    def __iter__(self) -> Iterator[AddressType]:
+        address_type = self._address_type
+        for index in self.written_indices():
+            yield address_type(index)
+
+    def written_indices(self) -> Iterator[int]:
+        """Iterate over the unsigned addresses that have been written, in order."""
+        find = self.written.find
+        index = find(1)
+        while index != -1:
+            yield index
+            index = find(1, index + 1)
+
+    def __len__(self) -> int:
+        return self.written.count(1)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+    def clear(self) -> None:
+        self.cells[:] = array(
+            self.cells.typecode, bytes(len(self.cells) * self.cells.itemsize)
+        )
+        self.written[:] = bytes(len(self.written))
 
 
 @dataclass
 class BaseMemoryState(BaseModuleState, Generic[AddressType, DataType]):
     """Common state for memory modules."""
 
+    memory: FlatMemory[AddressType, DataType]
     pending_address: Optional[AddressType] = None
     pending_data: Optional[DataType] = None
     remaining_cycles: Optional[int] = None
-    memory: Dict[AddressType, DataType] = field(default_factory=dict)
 
 
 class BaseMemory(BaseModule, Generic[AddressType, DataType]):
     """Base class for memory modules with common functionality."""
 
-    def __init__(self, name: str, latency_cycles: int) -> None:
-        self.state = BaseMemoryState[AddressType, DataType]()
+    def __init__(
+        self,
+        name: str,
+        latency_cycles: int,
+        memory: FlatMemory[AddressType, DataType],
+    ) -> None:
+        self.state = BaseMemoryState[AddressType, DataType](memory)
         super().__init__(name, self.state)
         self._latency_cycles = latency_cycles
 
@@ -79,17 +186,21 @@ class BaseMemory(BaseModule, Generic[AddressType, DataType]):
         """Read a value from memory at the pending address."""
         if self.state.pending_address is None:
             raise ValueError("No read operation pending.")
-        value = self.state.memory.get(self.state.pending_address)
-        if value is None:
-            raise ValueError(
-                f"Segmentation fault: address {self.state.pending_address} "
-                "has not been written to yet."
-            )
+        value = self._read_at(self.state.pending_address)
         # Only clear pending state after successfully getting the result
         self.state.pending_address = None
         self.state.pending_data = None
         return value
 
+    def _read_at(self, address: AddressType) -> DataType:
+        """Read a value from memory at an address, ignoring latency."""
+        value = self.state.memory.get(address)
+        if value is None:
+            raise ValueError(
+                f"Segmentation fault: address {address} has not been written to yet."
+            )
+        return value
+
     def update_state(self) -> None:
         """Update the memory state for the current cycle."""
         if self.state.remaining_cycles is not None and self.state.remaining_cycles > 0:
@@ -30,4 +30,4 @@ class BaseModule(ABC):
 
     def _initialize(self) -> None:
         """Initialize the module."""
-        logger.debug(f"Initializing module: {self.name}")
+        logger.debug("Initializing module: %s", self.name)
@@ -3,15 +3,27 @@ Author: Tom Riley
 Date: 2025-05-04
 """
 
+from turtle_toolkit.common.config import DATA_ADDRESS_WIDTH
 from turtle_toolkit.common.data_types import DataAddressBusValue, DataBusValue
-from turtle_toolkit.modules.base_memory import BaseMemory
+from turtle_toolkit.modules.base_memory import BaseMemory, FlatMemory
 
 MEMORY_LATENCY_CYCLES = 10
 
 
 class DataMemory(BaseMemory[DataAddressBusValue, DataBusValue]):
     def __init__(self, name: str) -> None:
-        super().__init__(name, MEMORY_LATENCY_CYCLES)
+        memory = FlatMemory[DataAddressBusValue, DataBusValue](
+            DATA_ADDRESS_WIDTH, "B", DataAddressBusValue.of, DataBusValue.of
+        )
+        super().__init__(name, MEMORY_LATENCY_CYCLES, memory)
+
+    def load(self, address: DataAddressBusValue) -> DataBusValue:
+        """Load a value from data memory without modelling latency."""
+        return self._read_at(address)
+
+    def store(self, address: DataAddressBusValue, value: DataBusValue) -> None:
+        """Store a value to data memory without modelling latency."""
+        self.state.memory[address] = value
 
     def request_load(self, address: DataAddressBusValue) -> None:
         """Request a load operation from data memory."""
@@ -4,6 +4,7 @@ Date: 2025-05-04
 """
 
 from dataclasses import dataclass
+from enum import IntEnum
 from typing import Optional
 
 from turtle_toolkit.common.data_types import DataBusValue, InstructionAddressBusValue
@@ -19,7 +20,26 @@ from turtle_toolkit.modules.base_module import BaseModule
 from turtle_toolkit.modules.instruction_memory import InstructionBinary
 
 
-@dataclass
+class DispatchId(IntEnum):
+    """Index of the simulator handler that executes a decoded instruction."""
+
+    ALU_REG = 0
+    ALU_IMM = 1
+    REG_SET = 2
+    REG_GET = 3
+    REG_PUT = 4
+    LOAD = 5
+    STORE = 6
+    BRANCH = 7
+    JUMP_IMM = 8
+    JUMP_REL = 9
+    JUMP_ABS = 10
+    HALT = 11
+    NOP = 12
+    INVALID_REG = 13
+
+
+@dataclass(slots=True)
 class DecodedInstruction:
     """Class to hold the decoded instruction."""
 
@@ -54,6 +74,9 @@ class DecodedInstruction:
     immediate_jump: bool
     relative_jump: bool
 
+    # Dispatch
+    dispatch_id: DispatchId
+
 
 class DecodeUnit(BaseModule):
     def decode(self, instruction_binary: InstructionBinary) -> DecodedInstruction:
@@ -67,15 +90,17 @@ class DecodeUnit(BaseModule):
         reg_idx_field = (inst >> 8) & 0xF
         data_imm_field = (inst >> 8) & 0xFF
 
+        halt_instruction = (
+            branch_field == 0
+            and op_field == Opcode.JUMP_IMM.value
+            and addr_imm_field == 0
+        )
+
         return DecodedInstruction(
-            halt_instruction=(
-                branch_field == 0
-                and op_field == Opcode.JUMP_IMM.value
-                and addr_imm_field == 0
-            ),
+            halt_instruction=halt_instruction,
             branch_instruction=(branch_field == 1),
             branch_condition=BranchCondition(branch_cond_field),
-            immediate_address_value=InstructionAddressBusValue(addr_imm_field),
+            immediate_address_value=InstructionAddressBusValue.of(addr_imm_field),
             alu_instruction=(
                 is_alu := (
                     branch_field == 0
@@ -88,7 +113,7 @@ class DecodeUnit(BaseModule):
             alu_immediate_instruction=(op_field == Opcode.ARITH_LOGIC_IMM.value),
             alu_function=ArithLogicFunction(func_field) if is_alu else None,
             register_index=RegisterIndex(reg_idx_field),
-            immediate_data_value=DataBusValue(data_imm_field),
+            immediate_data_value=DataBusValue.of(data_imm_field),
             register_file_instruction=(
                 branch_field == 0
                 and op_field == Opcode.REG_MEMORY.value
@@ -117,4 +142,40 @@ class DecodeUnit(BaseModule):
             ),
             immediate_jump=(op_field == Opcode.JUMP_IMM.value),
             relative_jump=(func_field == JumpFunction.JUMP_RELATIVE.value),
+            dispatch_id=self._dispatch_id(
+                halt_instruction, branch_field, op_field, func_field
+            ),
         )
+
+    @staticmethod
+    def _dispatch_id(
+        halt_instruction: bool, branch_field: int, op_field: int, func_field: int
+    ) -> DispatchId:
+        """Classify the instruction into the handler that executes it."""
+        if halt_instruction:
+            return DispatchId.HALT
+        if branch_field == 1:
+            return DispatchId.BRANCH
+        if op_field == Opcode.ARITH_LOGIC_IMM.value:
+            return DispatchId.ALU_IMM
+        if op_field == Opcode.ARITH_LOGIC.value:
+            return DispatchId.ALU_REG
+        if op_field == Opcode.REG_MEMORY.value:
+            if func_field == RegMemoryFunction.LOAD.value:
+                return DispatchId.LOAD
+            if func_field == RegMemoryFunction.STORE.value:
+                return DispatchId.STORE
+            if func_field == RegMemoryFunction.SET.value:
+                return DispatchId.REG_SET
+            if func_field == RegMemoryFunction.GET.value:
+                return DispatchId.REG_GET
+            if func_field == RegMemoryFunction.PUT.value:
+                return DispatchId.REG_PUT
+            return DispatchId.INVALID_REG
+        if op_field == Opcode.JUMP_IMM.value:
+            return DispatchId.JUMP_IMM
+        if op_field == Opcode.JUMP_REG.value:
+            if func_field == JumpFunction.JUMP_RELATIVE.value:
+                return DispatchId.JUMP_REL
+            return DispatchId.JUMP_ABS
+        return DispatchId.NOP
@@ -4,10 +4,11 @@ Date: 2025-05-04
 """
 
 from dataclasses import dataclass
+from typing import Optional
 
-from turtle_toolkit.common.config import INSTRUCTION_WIDTH
+from turtle_toolkit.common.config import INSTRUCTION_ADDRESS_WIDTH, INSTRUCTION_WIDTH
 from turtle_toolkit.common.data_types import InstructionAddressBusValue
-from turtle_toolkit.modules.base_memory import BaseMemory
+from turtle_toolkit.modules.base_memory import BaseMemory, FlatMemory
 
 INSTRUCTION_FETCH_LATENCY_CYCLES = 10
 
@@ -28,10 +29,25 @@ class InstructionBinary:
         elif isinstance(self.data, int) and (0 <= self.data < 2**INSTRUCTION_WIDTH):
             self.data = self.data.to_bytes(INSTRUCTION_WIDTH // 8, byteorder="little")
 
+    def unsigned_value(self) -> int:
+        """Return the instruction as an unsigned integer."""
+        return int.from_bytes(self.data, byteorder="little")
+
+    @classmethod
+    def from_unsigned_value(cls, value: int) -> "InstructionBinary":
+        """Create an instruction from its unsigned integer encoding."""
+        return cls(value.to_bytes(INSTRUCTION_WIDTH // 8, byteorder="little"))
+
 
 class InstructionMemory(BaseMemory[InstructionAddressBusValue, InstructionBinary]):
     def __init__(self, name: str) -> None:
-        super().__init__(name, INSTRUCTION_FETCH_LATENCY_CYCLES)
+        memory = FlatMemory[InstructionAddressBusValue, InstructionBinary](
+            INSTRUCTION_ADDRESS_WIDTH,
+            "H",
+            InstructionAddressBusValue.of,
+            InstructionBinary.from_unsigned_value,
+        )
+        super().__init__(name, INSTRUCTION_FETCH_LATENCY_CYCLES, memory)
 
     def side_load(self, binary: bytes) -> None:
         """Load binary data into memory."""
@@ -47,6 +63,15 @@ class InstructionMemory(BaseMemory[InstructionAddressBusValue, InstructionBinary
                     chunk
                 )
 
+    def peek(self, address: InstructionAddressBusValue) -> Optional[InstructionBinary]:
+        """Read an instruction without modelling fetch latency.
+        Returns None if the address has not been loaded."""
+        return self.state.memory.get(address)
+
+    def fetch(self, address: InstructionAddressBusValue) -> InstructionBinary:
+        """Fetch an instruction without modelling fetch latency."""
+        return self._read_at(address)
+
     def request_fetch(self, address: InstructionAddressBusValue) -> None:
         """Request a fetch operation from instruction memory."""
         self._start_operation(address)
@@ -13,7 +13,7 @@ from turtle_toolkit.modules.register_file import StatusRegisterValue
 
 
 class ProgramCounterState(BaseModuleState):
-    value = InstructionAddressBusValue(0)
+    value = InstructionAddressBusValue.of(0)
     next_value: Optional[InstructionAddressBusValue] = None
     stall: bool = False
 
@@ -25,7 +25,7 @@ class ProgramCounter(BaseModule):
 
     def increment(self):
         """Increment the program counter."""
-        self.state.next_value = self.state.value + InstructionAddressBusValue(
+        self.state.next_value = self.state.value + InstructionAddressBusValue.of(
             INSTRUCTION_WIDTH // 8
         )
 
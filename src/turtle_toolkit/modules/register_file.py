@@ -35,20 +35,20 @@ class RegisterFileState(BaseModuleState):
     # Register values
     registers: dict[RegisterIndex, DataBusValue] = field(
         default_factory=lambda: {
-            RegisterIndex.R0: DataBusValue(0),
-            RegisterIndex.R1: DataBusValue(0),
-            RegisterIndex.R2: DataBusValue(0),
-            RegisterIndex.R3: DataBusValue(0),
-            RegisterIndex.R4: DataBusValue(0),
-            RegisterIndex.R5: DataBusValue(0),
-            RegisterIndex.R6: DataBusValue(0),
-            RegisterIndex.R7: DataBusValue(0),
-            RegisterIndex.ACC: DataBusValue(0),
-            RegisterIndex.DBAR: DataBusValue(0),
-            RegisterIndex.DOFF: DataBusValue(0),
-            RegisterIndex.IBAR: DataBusValue(0),
-            RegisterIndex.IOFF: DataBusValue(0),
-            RegisterIndex.STATUS: DataBusValue(3),
+            RegisterIndex.R0: DataBusValue.of(0),
+            RegisterIndex.R1: DataBusValue.of(0),
+            RegisterIndex.R2: DataBusValue.of(0),
+            RegisterIndex.R3: DataBusValue.of(0),
+            RegisterIndex.R4: DataBusValue.of(0),
+            RegisterIndex.R5: DataBusValue.of(0),
+            RegisterIndex.R6: DataBusValue.of(0),
+            RegisterIndex.R7: DataBusValue.of(0),
+            RegisterIndex.ACC: DataBusValue.of(0),
+            RegisterIndex.DBAR: DataBusValue.of(0),
+            RegisterIndex.DOFF: DataBusValue.of(0),
+            RegisterIndex.IBAR: DataBusValue.of(0),
+            RegisterIndex.IOFF: DataBusValue.of(0),
+            RegisterIndex.STATUS: DataBusValue.of(3),
         }
     )
     pending_register: Optional[RegisterIndex] = None
@@ -76,7 +76,7 @@ class RegisterFile(BaseModule):
 
     def get_dmar_value(self) -> DataAddressBusValue:
         """Get the value of the data memory address register."""
-        return DataAddressBusValue(
+        return DataAddressBusValue.of(
             (
                 (
                     self.state.registers[RegisterIndex.DBAR].unsigned_value()
@@ -89,7 +89,7 @@ class RegisterFile(BaseModule):
 
     def get_imar_value(self) -> InstructionAddressBusValue:
         """Get the value of the instruction memory address register."""
-        return InstructionAddressBusValue(
+        return InstructionAddressBusValue.of(
             (
                 (
                     self.state.registers[RegisterIndex.IBAR].unsigned_value()
@@ -189,7 +189,9 @@ class RegisterFile(BaseModule):
             )
 
             # Update the STATUS register with the computed value
-            self.state.registers[RegisterIndex.STATUS] = DataBusValue(next_status_value)
+            self.state.registers[RegisterIndex.STATUS] = DataBusValue.of(
+                next_status_value
+            )
 
         # Clear pending flags regardless of whether status was updated
         self.state.pending_carry_flag = None
@@ -3,26 +3,41 @@ Author: Tom Riley
 Date: 2025-05-04
 """
 
-from collections import deque
+import re
 from dataclasses import dataclass, field
-from typing import Dict, Generator, Optional, Tuple, Union
+from typing import Callable, Dict, Generator, List, Optional, Tuple
 
 from turtle_toolkit.assembler import Assembler
-from turtle_toolkit.common.config import INSTRUCTION_WIDTH
+from turtle_toolkit.common.config import (
+    DATA_ADDRESS_WIDTH,
+    DATA_WIDTH,
+    INSTRUCTION_ADDRESS_WIDTH,
+    INSTRUCTION_WIDTH,
+)
 from turtle_toolkit.common.data_types import (
     DataAddressBusValue,
     DataBusValue,
     InstructionAddressBusValue,
 )
-from turtle_toolkit.common.instruction_data import RegisterIndex
+from turtle_toolkit.common.instruction_data import NUM_REGISTERS, RegisterIndex
 from turtle_toolkit.common.logger import logger
 from turtle_toolkit.common.singleton_meta import SingletonMeta
+from turtle_toolkit.fast_kernel import (
+    KernelInstruction,
+    encode_instruction,
+    run_kernel,
+)
 from turtle_toolkit.modules.alu import ALU
-from turtle_toolkit.modules.base_memory import BaseMemoryState
+from turtle_toolkit.modules.base_memory import BaseMemoryState, FlatMemory
 from turtle_toolkit.modules.base_module import BaseModuleState
-from turtle_toolkit.modules.data_memory import DataMemory
-from turtle_toolkit.modules.decoder import DecodedInstruction, DecodeUnit
+from turtle_toolkit.modules.data_memory import MEMORY_LATENCY_CYCLES, DataMemory
+from turtle_toolkit.modules.decoder import (
+    DecodedInstruction,
+    DecodeUnit,
+    DispatchId,
+)
 from turtle_toolkit.modules.instruction_memory import (
+    INSTRUCTION_FETCH_LATENCY_CYCLES,
     InstructionBinary,
     InstructionMemory,
 )
@@ -36,8 +51,67 @@ DATA_MEMORY_NAME = "DataMemory"
 REGISTER_FILE_NAME = "RegisterFile"
 PROGRAM_COUNTER_NAME = "ProgramCounter"
 
-AddressTypes = Union[InstructionAddressBusValue, DataAddressBusValue]
-DataTypes = Union[InstructionAddressBusValue, InstructionBinary]
+MAX_BLOCK_INSTRUCTIONS = 64
+
+# Instructions that complete in the cycle their fetch finishes and can not fault
+BLOCK_DISPATCH_IDS = frozenset(
+    {
+        DispatchId.ALU_REG,
+        DispatchId.ALU_IMM,
+        DispatchId.REG_SET,
+        DispatchId.REG_GET,
+        DispatchId.REG_PUT,
+        DispatchId.NOP,
+        DispatchId.BRANCH,
+        DispatchId.JUMP_IMM,
+        DispatchId.JUMP_REL,
+        DispatchId.JUMP_ABS,
+    }
+)
+# Instructions that may change the program counter and therefore end a block
+BLOCK_EXIT_DISPATCH_IDS = frozenset(
+    {
+        DispatchId.BRANCH,
+        DispatchId.JUMP_IMM,
+        DispatchId.JUMP_REL,
+        DispatchId.JUMP_ABS,
+    }
+)
+
+
+# The simulator instance, bound when it is created or reset. Lets callers reach
+# the singleton without going through SingletonMeta.__call__.
+SIM: Optional["Simulator"] = None
+
+# Binary string file syntax
+COMMENT_PATTERN = re.compile(r"//[^\n]*")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+BINARY_DIGITS_PATTERN = re.compile(r"[01]*")
+
+# Memory listing lines: address, then the value in decimal and hex
+INSTRUCTION_LISTING_TEMPLATE = "\t{0:#0%dx}: {1:<%d} ({1:#0%dx})" % (
+    INSTRUCTION_ADDRESS_WIDTH // 4 + 2,
+    len(str(2**INSTRUCTION_WIDTH - 1)),
+    INSTRUCTION_WIDTH // 4 + 2,
+)
+DATA_LISTING_TEMPLATE = "\t{0:#0%dx}: {1:<%d} ({1:#0%dx})" % (
+    DATA_ADDRESS_WIDTH // 4 + 2,
+    len(str(2**DATA_WIDTH - 1)),
+    DATA_WIDTH // 4 + 2,
+)
+
+# Register enum for each register index, and the widest register name
+REGISTER_BY_INDEX = {reg.value: reg for reg in RegisterIndex}
+REGISTER_NAME_MAX_LEN = max(len(reg.name) for reg in RegisterIndex)
+REGISTER_LISTING_TEMPLATE = "\t{0:%d}: {1:<4}({1:#0%dx})" % (
+    REGISTER_NAME_MAX_LEN,
+    DATA_WIDTH // 4 + 2,
+)
+
+# Binary string for every data value, as written by the data memory dump
+DATA_BINARY_STRINGS = tuple(
+    format(value, f"0{DATA_WIDTH}b") for value in range(1 << DATA_WIDTH)
+)
 
 
 class SimulationTimeout(Exception):
@@ -48,7 +122,7 @@ class SimulationTimeout(Exception):
         super().__init__(f"Simulation timed out after {cycle_count} cycles")
 
 
-@dataclass
+@dataclass(slots=True)
 class SimulatorState:
     """Class to hold the state of the simulator."""
 
@@ -56,9 +130,19 @@ class SimulatorState:
     halted: bool = False
     stalled: bool = False
     modules: Dict[str, BaseModuleState] = field(default_factory=dict)
-
-
-@dataclass
+    # Typed references to entries of modules, bound by Simulator.initialize_modules
+    instr_mem_state: Optional[BaseMemoryState] = field(
+        default=None, repr=False, compare=False
+    )
+    data_mem_state: Optional[BaseMemoryState] = field(
+        default=None, repr=False, compare=False
+    )
+    reg_file_state: Optional[RegisterFileState] = field(
+        default=None, repr=False, compare=False
+    )
+
+
+@dataclass(slots=True)
 class SimulationResult:
     """Class to hold the result of the simulation."""
 
@@ -67,14 +151,90 @@ class SimulationResult:
     # Add other result variables as needed
 
 
+@dataclass(slots=True)
+class Block:
+    """Straight-line run of instructions executed without per-cycle stepping.
+
+    A block starts at an instruction boundary and ends after the first branch,
+    jump or halt, or before the first instruction that can stall or fault.
+    Running it leaves the modules in the same state as stepping through its
+    cycles.
+    """
+
+    handlers: List[Callable[[DecodedInstruction], None]]
+    operands: List[DecodedInstruction]
+    cycle_cost: int
+    # Halt instruction ending the block, executed after the other instructions
+    halt: Optional[DecodedInstruction] = None
+
+    def run(self, simulator: "Simulator") -> Tuple[int, bool]:
+        """Execute the block on the simulator's modules.
+        Returns the cycles taken and whether the simulation halted."""
+        update_register_file = simulator._register_file.update_state
+        update_program_counter = simulator._program_counter.update_state
+        for handler, decoded_instruction in zip(self.handlers, self.operands):
+            handler(decoded_instruction)
+            update_register_file()
+            update_program_counter()
+        if self.halt is not None:
+            # Modules are not updated after the halting cycle
+            simulator._h_halt(self.halt)
+            return self.cycle_cost, True
+        return self.cycle_cost, False
+
+
 class Simulator(metaclass=SingletonMeta):
     """Singleton class for the simulator."""
 
     def __init__(self):
         logger.debug("Initializing Simulator instance.")
+        # Indexed by DecodedInstruction.dispatch_id
+        self._handlers: Tuple[Callable[[DecodedInstruction], None], ...] = (
+            self._h_alu_reg,
+            self._h_alu_imm,
+            self._h_reg_set,
+            self._h_reg_get,
+            self._h_reg_put,
+            self._h_load,
+            self._h_store,
+            self._h_branch,
+            self._h_jump_imm,
+            self._h_jump_rel,
+            self._h_jump_abs,
+            self._h_halt,
+            self._h_nop,
+            self._h_invalid_reg,
+        )
+        assert len(self._handlers) == len(DispatchId)
         self.reset()
+        self.set_memory_model(always_ready=False)
         logger.info("Simulator instance created.")
 
+    def set_memory_model(self, always_ready: bool) -> None:
+        """Choose whether memory latency is modelled.
+
+        When always_ready is set, instruction and data memories respond in the
+        cycle they are accessed, so every instruction takes a single cycle.
+        The choice is kept across resets. Change it between runs only.
+        """
+        self._cycle_impl: Callable[[], SimulatorState]
+        self._load_impl: Callable[[], bool]
+        self._store_impl: Callable[[], bool]
+        if always_ready:
+            self._cycle_impl = self._execute_cycle_noready
+            self._load_impl = self._handle_memory_load_noready
+            self._store_impl = self._handle_memory_store_noready
+            self._fetch_latency_cycles = 0
+            self._memory_latency_cycles = 0
+        else:
+            self._cycle_impl = self._execute_cycle
+            self._load_impl = self._handle_memory_load
+            self._store_impl = self._handle_memory_store
+            self._fetch_latency_cycles = INSTRUCTION_FETCH_LATENCY_CYCLES
+            self._memory_latency_cycles = MEMORY_LATENCY_CYCLES
+        # Block costs depend on the fetch latency
+        self._blocks.clear()
+
     def initialize_modules(self) -> None:
         self._state: SimulatorState
         self._alu: ALU = ALU(ALU_NAME)
@@ -85,6 +245,10 @@ class Simulator(metaclass=SingletonMeta):
         self._data_memory: DataMemory = DataMemory(DATA_MEMORY_NAME)
         self._register_file: RegisterFile = RegisterFile(REGISTER_FILE_NAME)
         self._program_counter: ProgramCounter = ProgramCounter(PROGRAM_COUNTER_NAME)
+        # Decoded instructions and blocks keyed by instruction address
+        self._decode_cache: Dict[int, DecodedInstruction] = {}
+        self._blocks: Dict[int, Block] = {}
+        self._kernel_program: Optional[List[Optional[KernelInstruction]]] = None
         self._state.modules[self._instruction_memory.name] = (
             self._instruction_memory.get_state_ref()
         )
@@ -95,10 +259,13 @@ class Simulator(metaclass=SingletonMeta):
         self._state.modules[self._program_counter.name] = (
             self._program_counter.get_state_ref()
         )
+        self._state.instr_mem_state = self._instruction_memory.state
+        self._state.data_mem_state = self._data_memory.state
+        self._state.reg_file_state = self._register_file.state
 
     def _execute_cycle(self) -> SimulatorState:
         """Execute a single cycle of the simulation."""
-        logger.debug(f"Executing cycle {self._state.cycle_count}.")
+        logger.debug("Executing cycle %d.", self._state.cycle_count)
 
         # Fetch stage
         if not self._handle_fetch_stage():
@@ -106,150 +273,231 @@ class Simulator(metaclass=SingletonMeta):
 
         # Decode stage
         decoded_instruction = self._handle_decode_stage()
-        if decoded_instruction is None:
-            return self._state
 
-        # Execute stage
-        if not self._handle_execute_stage(decoded_instruction):
-            return self._state
+        # Execute, memory and program counter stages
+        self._handlers[decoded_instruction.dispatch_id](decoded_instruction)
 
-        # Memory stage
-        if not self._handle_memory_stage(decoded_instruction):
-            return self._state
-
-        # Update program counter
-        self._update_program_counter(decoded_instruction)
+        return self._state
 
+    def _execute_cycle_noready(self) -> SimulatorState:
+        """Execute a single cycle with memories that are always ready.
+        A whole instruction is fetched, decoded and executed every cycle."""
+        logger.debug("Executing cycle %d.", self._state.cycle_count)
+        instruction_address = self._program_counter.get_current_instruction_address()
+        instruction = self._instruction_memory.fetch(instruction_address)
+        decoded_instruction = self._decode(
+            instruction_address.unsigned_value(), instruction
+        )
+        self._handlers[decoded_instruction.dispatch_id](decoded_instruction)
         return self._state
 
     def _handle_fetch_stage(self) -> bool:
         """Handle the fetch stage of the pipeline.
         Returns False if stalled."""
-        instruction_address = self._program_counter.get_current_instruction_address()
-        logger.debug(f"Fetching instruction from address {instruction_address}.")
-        self._instruction_memory.request_fetch(instruction_address)
+        program_counter = self._program_counter
+        instruction_memory = self._instruction_memory
+        instruction_address = program_counter.get_current_instruction_address()
+        logger.debug("Fetching instruction from address %s.", instruction_address)
+        instruction_memory.request_fetch(instruction_address)
 
-        if not self._instruction_memory.fetch_ready():
+        if not instruction_memory.fetch_ready():
             self._state.stalled = True
-            self._program_counter.set_stall(True)
+            program_counter.set_stall(True)
             logger.debug("Instruction fetch not ready, skipping this cycle.")
             return False
-        self._program_counter.set_stall(False)
+        program_counter.set_stall(False)
         self._state.stalled = False
 
         logger.debug("Instruction fetch ready, proceeding.")
         return True
 
-    def _handle_decode_stage(self) -> Optional[DecodedInstruction]:
+    def _handle_decode_stage(self) -> DecodedInstruction:
         """Handle the decode stage of the pipeline.
-        Returns None if the instruction should be skipped."""
+        Instructions are only decoded the first time their address is fetched."""
+        instruction_address = (
+            self._program_counter.get_current_instruction_address().unsigned_value()
+        )
         instruction = self._instruction_memory.get_fetch_result()
-        logger.debug(f"Fetched instruction: {instruction}.")
+        logger.debug("Fetched instruction: %s.", instruction)
 
-        decoded_instruction = self._decode_unit.decode(instruction)
-
-        if decoded_instruction.halt_instruction:
-            logger.info("HALT instruction encountered, stopping simulation.")
-            self._state.halted = True
-            return None
+        return self._decode(instruction_address, instruction)
 
+    def _decode(
+        self, instruction_address: int, instruction: InstructionBinary
+    ) -> DecodedInstruction:
+        """Decode an instruction, reusing the result for its address."""
+        decoded_instruction = self._decode_cache.get(instruction_address)
+        if decoded_instruction is None:
+            decoded_instruction = self._decode_unit.decode(instruction)
+            self._decode_cache[instruction_address] = decoded_instruction
         return decoded_instruction
 
-    def _handle_execute_stage(self, decoded_instruction: DecodedInstruction) -> bool:
-        """Handle the execute stage of the pipeline.
-        Returns False if stalled."""
-        # Get accumulator value
-        logger.debug(f"Accumulator value: {self._register_file.get_acc_value()}.")
-
-        # Handle ALU operations
-        if decoded_instruction.alu_instruction:
-            operand_b = self._get_alu_operand_b(decoded_instruction)
-            if not self._execute_alu_operation(decoded_instruction, operand_b):
-                return False
-
-        # Handle register operations
-        elif decoded_instruction.register_file_instruction:
-            if not self._handle_register_operation(decoded_instruction):
-                return False
-
-        return True
+    def _at_instruction_boundary(self) -> bool:
+        """Check that no fetch or memory operation is in flight."""
+        return (
+            self._instruction_memory.state.remaining_cycles is None
+            and self._data_memory.state.remaining_cycles is None
+        )
 
-    def _get_alu_operand_b(
-        self, decoded_instruction: DecodedInstruction
-    ) -> DataBusValue:
-        """Get the second operand for ALU operations."""
-        if decoded_instruction.alu_immediate_instruction:
-            operand_b = decoded_instruction.immediate_data_value
-            logger.debug(f"Using immediate value: {operand_b}.")
-        else:
-            operand_b = self._register_file.get_register_value(
-                decoded_instruction.register_index
+    def _get_block(self, instruction_address: int) -> Block:
+        """Get the block starting at an address, building it on first use."""
+        block = self._blocks.get(instruction_address)
+        if block is None:
+            block = self._build_block(instruction_address)
+            self._blocks[instruction_address] = block
+        return block
+
+    def _build_block(self, instruction_address: int) -> Block:
+        """Collect the block-safe instructions starting at an address.
+        The block is empty if the first instruction has to be stepped."""
+        handlers: List[Callable[[DecodedInstruction], None]] = []
+        operands: List[DecodedInstruction] = []
+        halt: Optional[DecodedInstruction] = None
+        address = instruction_address
+        while len(operands) < MAX_BLOCK_INSTRUCTIONS:
+            instruction = self._instruction_memory.peek(
+                InstructionAddressBusValue.of(address)
             )
-            logger.debug(f"Using register value: {operand_b}.")
-        return operand_b
+            if instruction is None:
+                break
+            try:
+                decoded_instruction = self._decode(address, instruction)
+            except ValueError:
+                # Leave the error to be raised when the instruction is stepped
+                break
+            dispatch_id = decoded_instruction.dispatch_id
+            if dispatch_id == DispatchId.HALT:
+                halt = decoded_instruction
+                break
+            if dispatch_id not in BLOCK_DISPATCH_IDS or (
+                dispatch_id == DispatchId.REG_PUT
+                and decoded_instruction.register_index
+                in (RegisterIndex.ACC, RegisterIndex.STATUS)
+            ):
+                break
+            handlers.append(self._handlers[dispatch_id])
+            operands.append(decoded_instruction)
+            if dispatch_id in BLOCK_EXIT_DISPATCH_IDS:
+                break
+            address = (address + INSTRUCTION_WIDTH // 8) % (
+                1 << INSTRUCTION_ADDRESS_WIDTH
+            )
+        instruction_count = len(operands) + (halt is not None)
+        return Block(
+            handlers,
+            operands,
+            instruction_count * (1 + self._fetch_latency_cycles),
+            halt,
+        )
 
-    def _execute_alu_operation(
-        self, decoded_instruction: DecodedInstruction, operand_b: DataBusValue
-    ) -> bool:
-        """Execute ALU operation and update state."""
+    def _h_alu_reg(self, decoded_instruction: DecodedInstruction) -> None:
+        """Execute an ALU operation with a register operand."""
+        operand_b = self._register_file.get_register_value(
+            decoded_instruction.register_index
+        )
         alu_outputs = self._alu.execute(
             self._register_file.get_acc_value(),
             operand_b,
             decoded_instruction.alu_function,
         )
-        acc_next = alu_outputs.result
-        self._register_file.set_next_acc_value(acc_next)
+        self._register_file.set_next_acc_value(alu_outputs.result)
         self._register_file.set_next_status_register_value(
-            alu_outputs.signed_overflow, alu_outputs.carry_flag, alu_outputs.positive_flag
+            alu_outputs.signed_overflow,
+            alu_outputs.carry_flag,
+            alu_outputs.positive_flag,
         )
-        logger.debug(f"ALU result: {acc_next}.")
-        return True
+        logger.debug("ALU result: %s.", alu_outputs.result)
+        self._program_counter.increment()
 
-    def _handle_register_operation(
-        self, decoded_instruction: DecodedInstruction
-    ) -> bool:
-        """Handle register file operations."""
-        if decoded_instruction.register_file_set:
-            acc_next = decoded_instruction.immediate_data_value
-            self._register_file.set_next_acc_value(acc_next)
-            logger.debug(f"Set accumulator to immediate value: {acc_next}.")
-        elif decoded_instruction.register_file_get:
-            acc_next = self._register_file.get_register_value(
-                decoded_instruction.register_index
-            )
-            self._register_file.set_next_acc_value(acc_next)
-            logger.debug(
-                f"Get register {decoded_instruction.register_index} value: {acc_next}."
-            )
-        elif decoded_instruction.register_file_put:
-            self._register_file.set_next_register_value(
-                decoded_instruction.register_index, self._register_file.get_acc_value()
-            )
-            logger.debug(
-                f"Set status register to {decoded_instruction.immediate_data_value}."
-            )
-        else:
-            logger.fatal("Invalid register file operation. This should never happen.")
-            raise RuntimeError("Invalid register file operation.")
+    def _h_alu_imm(self, decoded_instruction: DecodedInstruction) -> None:
+        """Execute an ALU operation with an immediate operand."""
+        alu_outputs = self._alu.execute(
+            self._register_file.get_acc_value(),
+            decoded_instruction.immediate_data_value,
+            decoded_instruction.alu_function,
+        )
+        self._register_file.set_next_acc_value(alu_outputs.result)
+        self._register_file.set_next_status_register_value(
+            alu_outputs.signed_overflow,
+            alu_outputs.carry_flag,
+            alu_outputs.positive_flag,
+        )
+        logger.debug("ALU result: %s.", alu_outputs.result)
+        self._program_counter.increment()
 
-        return True
+    def _h_reg_set(self, decoded_instruction: DecodedInstruction) -> None:
+        """Set the accumulator to the immediate value."""
+        acc_next = decoded_instruction.immediate_data_value
+        self._register_file.set_next_acc_value(acc_next)
+        logger.debug("Set accumulator to immediate value: %s.", acc_next)
+        self._program_counter.increment()
 
-    def _handle_memory_stage(self, decoded_instruction: DecodedInstruction) -> bool:
-        """Handle the memory stage of the pipeline.
-        Returns False if stalled."""
-        if not decoded_instruction.memory_instruction:
-            return True
+    def _h_reg_get(self, decoded_instruction: DecodedInstruction) -> None:
+        """Copy a register into the accumulator."""
+        acc_next = self._register_file.get_register_value(
+            decoded_instruction.register_index
+        )
+        self._register_file.set_next_acc_value(acc_next)
+        logger.debug(
+            "Get register %s value: %s.", decoded_instruction.register_index, acc_next
+        )
+        self._program_counter.increment()
 
-        if decoded_instruction.memory_load:
-            return self._handle_memory_load()
-        elif decoded_instruction.memory_store:
-            return self._handle_memory_store()
-        else:
-            logger.fatal("Invalid memory operation. This should never happen.")
-            raise RuntimeError("Invalid memory operation.")
+    def _h_reg_put(self, decoded_instruction: DecodedInstruction) -> None:
+        """Copy the accumulator into a register."""
+        self._register_file.set_next_register_value(
+            decoded_instruction.register_index, self._register_file.get_acc_value()
+        )
+        logger.debug("Put accumulator into %s.", decoded_instruction.register_index)
+        self._program_counter.increment()
+
+    def _h_invalid_reg(self, decoded_instruction: DecodedInstruction) -> None:
+        """Reject a register file operation with an unknown function."""
+        logger.fatal("Invalid register file operation. This should never happen.")
+        raise RuntimeError("Invalid register file operation.")
+
+    def _h_load(self, decoded_instruction: DecodedInstruction) -> None:
+        """Load the accumulator from data memory."""
+        if self._load_impl():
+            self._program_counter.increment()
+
+    def _h_store(self, decoded_instruction: DecodedInstruction) -> None:
+        """Store the accumulator to data memory."""
+        if self._store_impl():
+            self._program_counter.increment()
+
+    def _h_branch(self, decoded_instruction: DecodedInstruction) -> None:
+        """Conditionally branch on the status register."""
+        self._program_counter.conditionally_branch(
+            self._register_file.get_status_register_value(),
+            decoded_instruction.immediate_address_value,
+            decoded_instruction.branch_condition,
+        )
+
+    def _h_jump_imm(self, decoded_instruction: DecodedInstruction) -> None:
+        """Jump relative to the immediate address."""
+        self._program_counter.jump_relative(decoded_instruction.immediate_address_value)
+
+    def _h_jump_rel(self, decoded_instruction: DecodedInstruction) -> None:
+        """Jump relative to the instruction memory address register."""
+        self._program_counter.jump_relative(self._register_file.get_imar_value())
+
+    def _h_jump_abs(self, decoded_instruction: DecodedInstruction) -> None:
+        """Jump to the instruction memory address register."""
+        self._program_counter.jump_absolute(self._register_file.get_imar_value())
+
+    def _h_halt(self, decoded_instruction: DecodedInstruction) -> None:
+        """Halt the simulation."""
+        logger.info("HALT instruction encountered, stopping simulation.")
+        self._state.halted = True
+
+    def _h_nop(self, decoded_instruction: DecodedInstruction) -> None:
+        """Advance past an instruction with no effect."""
+        self._program_counter.increment()
 
     def _handle_memory_load(self) -> bool:
-        """Handle memory load operation."""
+        """Handle memory load operation.
+        Returns False if stalled."""
         self._data_memory.request_load(self._register_file.get_dmar_value())
         if not self._data_memory.load_ready():
             self._state.stalled = True
@@ -262,11 +510,12 @@ class Simulator(metaclass=SingletonMeta):
 
         acc_next = self._data_memory.get_load_result()
         self._register_file.set_next_acc_value(acc_next)
-        logger.debug(f"Loaded value from memory: {acc_next}.")
+        logger.debug("Loaded value from memory: %s.", acc_next)
         return True
 
     def _handle_memory_store(self) -> bool:
-        """Handle memory store operation."""
+        """Handle memory store operation.
+        Returns False if stalled."""
         self._data_memory.request_store(
             self._register_file.get_dmar_value(), self._register_file.get_acc_value()
         )
@@ -282,29 +531,20 @@ class Simulator(metaclass=SingletonMeta):
         logger.debug("Memory store complete.")
         return True
 
-    def _update_program_counter(self, decoded_instruction: DecodedInstruction) -> None:
-        """Update the program counter based on the instruction type."""
-        if decoded_instruction.branch_instruction:
-            self._program_counter.conditionally_branch(
-                self._register_file.get_status_register_value(),
-                decoded_instruction.immediate_address_value,
-                decoded_instruction.branch_condition,
-            )
-        elif decoded_instruction.jump_instruction:
-            self._handle_jump_instruction(decoded_instruction)
-        else:
-            self._program_counter.increment()
+    def _handle_memory_load_noready(self) -> bool:
+        """Handle memory load operation with a data memory that is always ready."""
+        acc_next = self._data_memory.load(self._register_file.get_dmar_value())
+        self._register_file.set_next_acc_value(acc_next)
+        logger.debug("Loaded value from memory: %s.", acc_next)
+        return True
 
-    def _handle_jump_instruction(self, decoded_instruction: DecodedInstruction) -> None:
-        """Handle different types of jump instructions."""
-        if decoded_instruction.immediate_jump:
-            self._program_counter.jump_relative(
-                decoded_instruction.immediate_address_value
-            )
-        elif decoded_instruction.relative_jump:
-            self._program_counter.jump_relative(self._register_file.get_imar_value())
-        else:
-            self._program_counter.jump_absolute(self._register_file.get_imar_value())
+    def _handle_memory_store_noready(self) -> bool:
+        """Handle memory store operation with a data memory that is always ready."""
+        self._data_memory.store(
+            self._register_file.get_dmar_value(), self._register_file.get_acc_value()
+        )
+        logger.debug("Memory store complete.")
+        return True
 
     def _update_module_states(self) -> None:
         self._register_file.update_state()
@@ -315,17 +555,46 @@ class Simulator(metaclass=SingletonMeta):
     def run(
         self, num_cycles: Optional[int] = None
     ) -> Generator[SimulatorState, None, SimulationResult]:
-        logger.debug(f"Running simulator for {num_cycles} cycles.")
-        cycles_run = 0
+        """Run the simulation, yielding the state after each cycle or block.
+
+        Straight-line code is executed a block at a time when the remaining
+        cycle budget allows it; everything else is stepped cycle by cycle.
+        """
+        logger.debug("Running simulator for %s cycles.", num_cycles)
+        # Count against the state's cycle count rather than a separate counter
+        stop_cycle = (
+            None if num_cycles is None else self._state.cycle_count + num_cycles
+        )
         while True:
-            if num_cycles is not None and cycles_run >= num_cycles:
+            if stop_cycle is not None and self._state.cycle_count >= stop_cycle:
                 logger.info("Reached the specified number of cycles.")
                 break
-            self._execute_cycle()
-            cycles_run += 1
+            if self._at_instruction_boundary():
+                block = self._get_block(
+                    self._program_counter.get_current_instruction_address().unsigned_value()
+                )
+                if block.cycle_cost and (
+                    stop_cycle is None
+                    or self._state.cycle_count + block.cycle_cost <= stop_cycle
+                ):
+                    cycles, halted = block.run(self)
+                    self._state.cycle_count += cycles
+                    logger.debug(
+                        "Executed block of %d instructions: cycle count is now %d.",
+                        len(block.operands),
+                        self._state.cycle_count,
+                    )
+                    if halted:
+                        logger.info(
+                            f"Simulation halted at cycle {self._state.cycle_count}."
+                        )
+                        break
+                    yield self._state
+                    continue
+            self._cycle_impl()
             self._state.cycle_count += 1
             logger.debug(
-                f"Simulator tick: cycle count is now {self._state.cycle_count}."
+                "Simulator tick: cycle count is now %d.", self._state.cycle_count
             )
             if self._state.halted:
                 logger.info(f"Simulation halted at cycle {self._state.cycle_count}.")
@@ -335,13 +604,110 @@ class Simulator(metaclass=SingletonMeta):
         logger.info(f"Simulation completed after {self._state.cycle_count} cycles.")
         return SimulationResult(self._state.cycle_count, self._state)
 
-    def run_until_halt(self, max_cycles: Optional[int] = None) -> SimulationResult:
+    def _run_fast(self, num_cycles: Optional[int] = None) -> SimulationResult:
+        """Run the simulation like run(), without yielding intermediate states."""
+        logger.debug("Running simulator for %s cycles.", num_cycles)
+        # Bind everything the loop touches to locals once
+        state = self._state
+        instruction_memory_state = self._instruction_memory.state
+        data_memory_state = self._data_memory.state
+        program_counter_state = self._program_counter.state
+        blocks = self._blocks
+        build_block = self._build_block
+        execute_cycle = self._cycle_impl
+        update_module_states = self._update_module_states
+        # Count against the state's cycle count rather than a separate counter
+        stop_cycle = None if num_cycles is None else state.cycle_count + num_cycles
+        while True:
+            if stop_cycle is not None and state.cycle_count >= stop_cycle:
+                logger.info("Reached the specified number of cycles.")
+                break
+            if (
+                instruction_memory_state.remaining_cycles is None
+                and data_memory_state.remaining_cycles is None
+            ):
+                instruction_address = program_counter_state.value.unsigned_value()
+                block = blocks.get(instruction_address)
+                if block is None:
+                    block = blocks[instruction_address] = build_block(
+                        instruction_address
+                    )
+                if block.cycle_cost and (
+                    stop_cycle is None
+                    or state.cycle_count + block.cycle_cost <= stop_cycle
+                ):
+                    cycles, halted = block.run(self)
+                    state.cycle_count += cycles
+                    if halted:
+                        logger.info(f"Simulation halted at cycle {state.cycle_count}.")
+                        break
+                    continue
+            execute_cycle()
+            state.cycle_count += 1
+            if state.halted:
+                logger.info(f"Simulation halted at cycle {state.cycle_count}.")
+                break
+            update_module_states()
+        logger.info(f"Simulation completed after {state.cycle_count} cycles.")
+        return SimulationResult(state.cycle_count, state)
+
+    def _get_kernel_program(self) -> List[Optional[KernelInstruction]]:
+        """Get the loaded program encoded for the fast kernel, indexed by address."""
+        if self._kernel_program is None:
+            program: List[Optional[KernelInstruction]] = [None] * (
+                1 << INSTRUCTION_ADDRESS_WIDTH
+            )
+            for address, instruction in self._instruction_memory.state.memory.items():
+                instruction_address = address.unsigned_value()
+                try:
+                    decoded_instruction = self._decode(instruction_address, instruction)
+                except ValueError:
+                    # Leave the error to be raised when the instruction is stepped
+                    continue
+                program[instruction_address] = encode_instruction(decoded_instruction)
+            self._kernel_program = program
+        return self._kernel_program
+
+    def _run_kernel(self, num_cycles: Optional[int]) -> int:
+        """Run whole instructions on the fast kernel from an instruction boundary.
+        Returns the number of cycles executed."""
+        registers_dict = self._register_file.state.registers
+        data_memory = self._data_memory.state.memory
+
+        registers = [0] * NUM_REGISTERS
+        for reg, value in registers_dict.items():
+            registers[reg.value] = value.unsigned_value()
+
+        # The kernel works on the data memory arrays in place
+        cycles, pc = run_kernel(
+            registers,
+            data_memory.cells,
+            data_memory.written,
+            self._get_kernel_program(),
+            self._program_counter.state.value.unsigned_value(),
+            num_cycles,
+            self._fetch_latency_cycles,
+            self._memory_latency_cycles,
+        )
+
+        for reg in registers_dict:
+            registers_dict[reg] = DataBusValue.of(registers[reg.value])
+        self._program_counter.state.value = InstructionAddressBusValue.of(pc)
+        self._state.cycle_count += cycles
+        logger.debug("Fast kernel executed %d cycles.", cycles)
+        return cycles
+
+    def run_until_halt(
+        self, max_cycles: Optional[int] = None, use_fast: bool = False
+    ) -> SimulationResult:
         """
         Run the simulation until a halt instruction is encountered or max_cycles is reached.
 
         Args:
             max_cycles (Optional[int]): Maximum number of cycles to run. If None, runs until halt.
                                         Acts as a watchdog timer to prevent infinite loops.
+            use_fast (bool): Run as much of the program as possible on the integer-only
+                             fast kernel before continuing with the regular simulation.
 
         Returns:
             SimulationResult: The result of the simulation.
@@ -349,89 +715,65 @@ class Simulator(metaclass=SingletonMeta):
         Raises:
             SimulationTimeout: If the simulation reaches max_cycles without halting.
         """
-        gen = self.run(max_cycles)
         try:
-            deque(gen, maxlen=0)  # Consume the generator to run the simulation
-            next(gen)
-        except StopIteration as e:
-            logger.debug("Simulation completed.")
-            result = getattr(e, "value", None)
-
-            # If we reached max_cycles and simulation didn't halt naturally, raise timeout
-            if (
-                max_cycles is not None
-                and self._state.cycle_count >= max_cycles
-                and not self._state.halted
-            ):
-                raise SimulationTimeout(self._state.cycle_count)
-
-            # If we don't have a result from the StopIteration, create one
-            if result is None:
-                result = SimulationResult(self._state.cycle_count, self._state)
-
-            return result
+            num_cycles = max_cycles
+            if use_fast and self._at_instruction_boundary():
+                kernel_cycles = self._run_kernel(max_cycles)
+                if max_cycles is not None:
+                    num_cycles = max_cycles - kernel_cycles
+            result = self._run_fast(num_cycles)
         except Exception as e:
             formatted_state = self.format_simulator_state()
             logger.error(f"Simulation state:\n{formatted_state}")
             logger.error(f"Simulation failed: {e}")
-            raise e
-        raise RuntimeError("Simulation failed")
+            raise
+        logger.debug("Simulation completed.")
+
+        # If we reached max_cycles and simulation didn't halt naturally, raise timeout
+        if (
+            max_cycles is not None
+            and self._state.cycle_count >= max_cycles
+            and not self._state.halted
+        ):
+            raise SimulationTimeout(self._state.cycle_count)
+
+        return result
 
     def get_state(self) -> SimulatorState:
         """Get the current state of the simulator."""
         return self._state
 
-    def _format_memory_contents(
-        self, memory_dict: Dict[AddressTypes, DataTypes]
-    ) -> str:
-        """Format memory contents in a more readable way.
-
-        Args:
-            memory_dict: Dictionary of memory values
-            address_type: Type of address (Instruction or Data)
-
-        Returns:
-            Formatted string representation of memory contents
-        """
-        if len(memory_dict) == 0:
+    @staticmethod
+    def _format_memory_listing(memory: FlatMemory, line_template: str) -> str:
+        """Format written memory locations, one line per address."""
+        if len(memory) == 0:
             return "\tMemory is unwritten."
+        format_line = line_template.format
+        cells = memory.cells
+        return "\n".join(
+            [
+                format_line(address, cells[address])
+                for address in memory.written_indices()
+            ]
+        )
 
-        result = []
-
-        def _get_addr_unsigned_value(
-            addr_value_pair: Tuple[AddressTypes, DataTypes],
-        ) -> int:
-            """Get the unsigned value of the address."""
-            if hasattr(addr_value_pair[0], "unsigned_value"):
-                return addr_value_pair[0].unsigned_value()
-            else:
-                raise ValueError(
-                    f"Unsupported address type: {type(addr_value_pair[0])}"
-                )
-
-        for address, value in sorted(memory_dict.items(), key=_get_addr_unsigned_value):
-            if isinstance(value, InstructionBinary):
-                unsigned = int.from_bytes(value.data, byteorder="little")
-                hex_width = len(value.data) * 2
-                dec_width = len(str(2**INSTRUCTION_WIDTH - 1))
-            else:
-                unsigned = value.unsigned_value()
-                hex_width = value._bus_width // 4
-                dec_width = len(str(2**value._bus_width - 1))
-            result.append(
-                f"\t{address.unsigned_value():#0{((address._bus_width // 4)+2)}x}: {unsigned:<{dec_width}} ({unsigned:#0{hex_width+2}x})"
-            )
+    def _format_instruction_memory(
+        self, memory: FlatMemory[InstructionAddressBusValue, InstructionBinary]
+    ) -> str:
+        """Format instruction memory contents in a more readable way."""
+        return self._format_memory_listing(memory, INSTRUCTION_LISTING_TEMPLATE)
 
-        return "\n".join(result)
+    def _format_data_memory(
+        self, memory: FlatMemory[DataAddressBusValue, DataBusValue]
+    ) -> str:
+        """Format data memory contents in a more readable way."""
+        return self._format_memory_listing(memory, DATA_LISTING_TEMPLATE)
 
     def format_simulator_state(self) -> str:
         """Format the simulator state in a more readable way."""
-        instr_mem_state: Optional[BaseModuleState] = self._state.modules.get(
-            INSTRUCTION_MEMORY_NAME, None
-        )
-        data_mem_state: Optional[BaseModuleState] = self._state.modules.get(
-            DATA_MEMORY_NAME, None
-        )
+        instr_mem_state = self._state.instr_mem_state
+        data_mem_state = self._state.data_mem_state
+        reg_file_state = self._state.reg_file_state
 
         if instr_mem_state is None:
             raise RuntimeError(
@@ -441,71 +783,54 @@ class Simulator(metaclass=SingletonMeta):
             raise RuntimeError(
                 f"DataMemory module not found in state: {self._state.modules}"
             )
-        if not isinstance(instr_mem_state, BaseMemoryState):
-            raise RuntimeError(
-                f"InstructionMemory state is not of type BaseMemoryState: {type(instr_mem_state)}"
-            )
-        if not isinstance(data_mem_state, BaseMemoryState):
-            raise RuntimeError(
-                f"DataMemory state is not of type BaseMemoryState: {type(data_mem_state)}"
-            )
-
-        instr_memory_dict = instr_mem_state.memory
-        data_memory_dict = data_mem_state.memory
-
-        reg_file_state = self._state.modules.get(REGISTER_FILE_NAME, None)
-
         if reg_file_state is None:
             raise RuntimeError(
                 f"RegisterFile module not found in state: {self._state.modules}"
             )
-        if not isinstance(reg_file_state, RegisterFileState):
-            raise RuntimeError(
-                f"RegisterFile state is not of type RegisterFileState: {type(reg_file_state)}"
-            )
 
-        result = [
+        # Every section is collected once and joined in a single pass
+        parts = [
             f"Simulator State (Cycle: {self._state.cycle_count}, Halted: {self._state.halted}, Stalled: {self._state.stalled})",
-            "",
-            "Instruction Memory:",
-            self._format_memory_contents(instr_memory_dict),
+            "\nInstruction Memory:",
+            self._format_instruction_memory(instr_mem_state.memory),
+            "\nData Memory:",
+            self._format_data_memory(data_mem_state.memory),
+            "\nRegister File:",
         ]
-
-        # Add data memory section
-        result.extend(
-            ["", "Data Memory:", self._format_memory_contents(data_memory_dict)]
-        )
-
-        # Add register file if available
-        result.extend(["", "Register File:"])
-
-        reg_name_max_len = max(len(member.name) for member in RegisterIndex)
-
+        format_register = REGISTER_LISTING_TEMPLATE.format
         for reg, value in reg_file_state.registers.items():
-            result.append(
-                f"\t{reg.name:{reg_name_max_len}}: {value.unsigned_value():<4}({value.unsigned_value():#0{(value._bus_width // 4) + 2}x})"
-            )
+            parts.append(format_register(reg.name, value.unsigned_value()))
 
-        return "\n".join(result)
+        return "\n".join(parts)
 
     def reset(self) -> None:
         """Reset the simulator state."""
+        global SIM
         logger.debug("Resetting simulator state.")
+        SIM = self
         self._state = SimulatorState()
         self.initialize_modules()
         logger.info("Simulator state reset.")
 
+    def _clear_program_caches(self) -> None:
+        """Drop everything derived from the instruction memory contents."""
+        self._decode_cache.clear()
+        self._blocks.clear()
+        self._kernel_program = None
+
     def load_program(self, program: str) -> None:
         """Load a program into the instruction memory."""
         logger.debug("Loading program into instruction memory.")
         binary = Assembler.assemble(program)
         self._instruction_memory.side_load(binary)
+        self._clear_program_caches()
         logger.info("Program loaded into instruction memory.")
 
     def load_binary(self, binary: bytes) -> None:
         """Load binary data into the instruction memory."""
         logger.debug("Loading binary data into instruction memory.")
         self._instruction_memory.side_load(binary)
+        self._clear_program_caches()
         logger.info("Binary data loaded into instruction memory.")
 
     def load_binary_string_file(self, file_path: str) -> None:
@@ -527,7 +852,7 @@ class Simulator(metaclass=SingletonMeta):
             00110100
             00001010
         """
-        logger.debug(f"Loading binary string file: {file_path}")
+        logger.debug("Loading binary string file: %s", file_path)
 
         try:
             with open(file_path, "r") as file:
@@ -536,21 +861,11 @@ class Simulator(metaclass=SingletonMeta):
             logger.error(f"Error reading binary string file {file_path}: {e}")
             raise
 
-        # Remove all comments (// to end of line)
-        lines = content.split("\n")
-        cleaned_lines = []
-        for line in lines:
-            # Remove everything after // (including //)
-            if "//" in line:
-                line = line[: line.index("//")]
-            cleaned_lines.append(line)
-
-        # Join all lines and remove all whitespace
-        binary_text = "".join(cleaned_lines)
-        binary_text = "".join(binary_text.split())  # Remove all whitespace
+        # Remove all comments (// to end of line) and all whitespace
+        binary_text = WHITESPACE_PATTERN.sub("", COMMENT_PATTERN.sub("", content))
 
         # Validate that we only have binary digits
-        if not all(c in "01" for c in binary_text):
+        if not BINARY_DIGITS_PATTERN.fullmatch(binary_text):
             invalid_chars = set(c for c in binary_text if c not in "01")
             raise ValueError(
                 f"Invalid characters in binary string: {invalid_chars}. Only '0' and '1' are allowed."
@@ -567,12 +882,12 @@ class Simulator(metaclass=SingletonMeta):
             )
             binary_text += "0" * padding_needed
 
-        # Convert binary string to bytes
-        binary_data = bytearray()
-        for i in range(0, len(binary_text), 8):
-            byte_str = binary_text[i : i + 8]
-            byte_value = int(byte_str, 2)
-            binary_data.append(byte_value)
+        # Convert binary string to bytes in one go. int() parses power-of-two
+        # bases in linear time, so this is faster than going through
+        # bytes.fromhex() and needs no chunking for large files
+        binary_data = bytearray(
+            int(binary_text, 2).to_bytes(len(binary_text) // 8, byteorder="big")
+        )
 
         # Ensure we have complete instructions (even number of bytes)
         if len(binary_data) % 2 != 0:
@@ -598,36 +913,37 @@ class Simulator(metaclass=SingletonMeta):
         """
         logger.debug("Getting data memory state dump")
 
-        data_mem_state = self._state.modules.get(DATA_MEMORY_NAME, None)
-        if data_mem_state is None or not isinstance(data_mem_state, BaseMemoryState):
+        data_mem_state = self._state.data_mem_state
+        if data_mem_state is None:
             raise RuntimeError("DataMemory state not found or invalid")
 
         # Create binary string format output
         lines = ["// Final data memory contents"]
 
-        if len(data_mem_state.memory) == 0:
+        memory = data_mem_state.memory
+        written = memory.written
+        min_addr = written.find(1)
+
+        if min_addr == -1:
             if dump_full_memory:
                 lines.append("// Memory is empty - showing full address space")
                 # Get the data bus width to determine memory size
                 # Assume 8-bit data width and typical address space
                 max_address = 255  # 2^8 - 1 for 8-bit addressing
-                for address in range(max_address + 1):
-                    lines.append(f"{'0' * 8} // Address 0x{address:04x}")
+                lines.extend(
+                    [
+                        f"{'0' * 8} // Address 0x{address:04x}"
+                        for address in range(max_address + 1)
+                    ]
+                )
             else:
                 lines.append("// Memory is empty")
         else:
-            # Get the range of addresses to dump
-            written_addresses = [
-                addr.unsigned_value() for addr in data_mem_state.memory.keys()
-            ]
-            min_addr = min(written_addresses)
-            max_addr = max(written_addresses)
+            max_addr = written.rfind(1)
 
             if dump_full_memory:
                 # Dump entire memory space from 0 to maximum possible address
-                # For data memory, assume full address space based on address bus width
-                first_addr = list(data_mem_state.memory.keys())[0]
-                max_possible_addr = (1 << first_addr._bus_width) - 1
+                max_possible_addr = len(written) - 1
                 dump_range = range(0, max_possible_addr + 1)
                 lines.append(
                     f"// Dumping full memory space: 0x0000 to 0x{max_possible_addr:04x}"
@@ -639,29 +955,15 @@ class Simulator(metaclass=SingletonMeta):
                     f"// Dumping contiguous range: 0x{min_addr:04x} to 0x{max_addr:04x}"
                 )
 
-            # Create a lookup for written memory locations
-            memory_lookup = {
-                addr.unsigned_value(): value
-                for addr, value in data_mem_state.memory.items()
-            }
-
-            # Generate contiguous memory dump
-            for address in dump_range:
-                if address in memory_lookup:
-                    # Memory location has been written
-                    value = memory_lookup[address]
-                    if hasattr(value, "unsigned_value"):
-                        binary_str = format(
-                            value.unsigned_value(), f"0{value._bus_width}b"
-                        )
-                        lines.append(f"{binary_str} // Address 0x{address:04x}")
-                    else:
-                        lines.append(
-                            f"// Unknown value type at address 0x{address:04x}"
-                        )
-                else:
-                    # Memory location is unwritten - fill with zeros
-                    lines.append(f"{'0' * 8} // Address 0x{address:04x}")
+            # Generate contiguous memory dump, unwritten locations read as zero
+            lines.extend(
+                [
+                    f"{DATA_BINARY_STRINGS[value]} // Address 0x{address:04x}"
+                    for address, value in zip(
+                        dump_range, memory.cells[dump_range.start : dump_range.stop]
+                    )
+                ]
+            )
 
         output_content = "\n".join(lines) + "\n"
         return output_content
@@ -674,24 +976,18 @@ class Simulator(metaclass=SingletonMeta):
         """
         logger.debug("Getting register file state dump")
 
-        reg_file_state = self._state.modules.get(REGISTER_FILE_NAME, None)
-        if reg_file_state is None or not isinstance(reg_file_state, RegisterFileState):
+        reg_file_state = self._state.reg_file_state
+        if reg_file_state is None:
             raise RuntimeError("RegisterFile state not found or invalid")
 
         # Create binary string format output as a contiguous memory array
         lines = ["// Final register contents"]
 
-        # Create a mapping from register index value to register enum
-        register_by_index = {reg.value: reg for reg in RegisterIndex}
-
-        # Find the maximum index to determine array size
-        max_index = max(reg.value for reg in RegisterIndex)
-
-        # Create contiguous array from index 0 to max_index
-        for index in range(max_index + 1):
-            if index in register_by_index:
+        # Create contiguous array from index 0 to the maximum register index
+        for index in range(NUM_REGISTERS):
+            if index in REGISTER_BY_INDEX:
                 # Real register exists at this index
-                reg_enum = register_by_index[index]
+                reg_enum = REGISTER_BY_INDEX[index]
                 if reg_enum in reg_file_state.registers:
                     value = reg_file_state.registers[reg_enum]
                     binary_str = format(value.unsigned_value(), f"0{value._bus_width}b")
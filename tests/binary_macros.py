@@ -5,3 +5,5 @@ Date: 2025-05-11
 
 INSTRUCTION_NOP = b"\x00\x00"
 INSTRUCTION_HALT = b"\x08\x00"
+INSTRUCTION_JMPR = b"\x0e\x00"
+INSTRUCTION_JMP = b"\x1e\x00"
@@ -80,3 +80,33 @@ def test_load_from_unwritten_address(data_memory):
     with pytest.raises(ValueError) as excinfo:
         data_memory.get_load_result()
     assert "Segmentation fault" in str(excinfo.value)
+
+
+def test_memory_contents_in_address_order(data_memory):
+    """Test that the memory contents are listed by ascending address"""
+    memory = data_memory.state.memory
+    memory[DataAddressBusValue(0x200)] = DataBusValue(2)
+    memory[DataAddressBusValue(0x010)] = DataBusValue(1)
+    memory[DataAddressBusValue(0xFFF)] = DataBusValue(3)
+    assert list(memory.items()) == [
+        (DataAddressBusValue(0x010), DataBusValue(1)),
+        (DataAddressBusValue(0x200), DataBusValue(2)),
+        (DataAddressBusValue(0xFFF), DataBusValue(3)),
+    ]
+    assert memory.get(DataAddressBusValue(0x011)) is None
+    del memory[DataAddressBusValue(0x200)]
+    assert len(memory) == 2
+    memory.clear()
+    assert memory == {}
+
+
+def test_untimed_store_and_load(data_memory):
+    """Test storing and loading without modelling latency"""
+    address = DataAddressBusValue(0x100)
+    data_memory.store(address, DataBusValue(42))
+    assert data_memory.load(address) == DataBusValue(42)
+    assert data_memory.state.pending_address is None
+    assert data_memory.state.remaining_cycles is None
+    with pytest.raises(ValueError) as excinfo:
+        data_memory.load(DataAddressBusValue(0x101))
+    assert "Segmentation fault" in str(excinfo.value)
@@ -2,10 +2,15 @@ import pytest
 
 from turtle_toolkit.assembler import Assembler
 from turtle_toolkit.common.instruction_data import ArithLogicFunction, BranchCondition
-from turtle_toolkit.modules.decoder import DecodeUnit
+from turtle_toolkit.modules.decoder import DecodeUnit, DispatchId
 from turtle_toolkit.modules.instruction_memory import InstructionBinary
 
-from .binary_macros import INSTRUCTION_HALT, INSTRUCTION_NOP
+from .binary_macros import (
+    INSTRUCTION_HALT,
+    INSTRUCTION_JMP,
+    INSTRUCTION_JMPR,
+    INSTRUCTION_NOP,
+)
 
 
 @pytest.fixture
@@ -41,3 +46,38 @@ def test_decode_branch_instruction(decoder):
     decoded = decoder.decode(binary_data)
     assert decoded.branch_instruction
     assert decoded.branch_condition == BranchCondition.ZERO
+
+
+@pytest.mark.parametrize(
+    "source, dispatch_id",
+    [
+        ("ADD R0", DispatchId.ALU_REG),
+        ("ADDI 1", DispatchId.ALU_IMM),
+        ("INV", DispatchId.ALU_REG),
+        ("SET 1", DispatchId.REG_SET),
+        ("GET R1", DispatchId.REG_GET),
+        ("PUT R1", DispatchId.REG_PUT),
+        ("LOAD", DispatchId.LOAD),
+        ("STORE", DispatchId.STORE),
+        ("BNZ 0x04", DispatchId.BRANCH),
+        ("JMPI 0x04", DispatchId.JUMP_IMM),
+        ("HALT", DispatchId.HALT),
+    ],
+)
+def test_decode_dispatch_id(decoder, source, dispatch_id):
+    binary_data = InstructionBinary(Assembler.assemble(source))
+    decoded = decoder.decode(binary_data)
+    assert decoded.dispatch_id == dispatch_id
+
+
+@pytest.mark.parametrize(
+    "binary, dispatch_id",
+    [
+        (INSTRUCTION_JMPR, DispatchId.JUMP_REL),
+        (INSTRUCTION_JMP, DispatchId.JUMP_ABS),
+    ],
+)
+def test_decode_jump_register_dispatch_id(decoder, binary, dispatch_id):
+    binary_data = InstructionBinary(binary)
+    decoded = decoder.decode(binary_data)
+    assert decoded.dispatch_id == dispatch_id
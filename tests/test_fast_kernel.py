@@ -0,0 +1,106 @@
+import pytest
+
+from turtle_toolkit.assembler import Assembler
+from turtle_toolkit.common.config import DATA_ADDRESS_WIDTH, INSTRUCTION_ADDRESS_WIDTH
+from turtle_toolkit.common.instruction_data import NUM_REGISTERS, RegisterIndex
+from turtle_toolkit.fast_kernel import (
+    encode_instruction,
+    memory_instruction_cycles,
+    run_kernel,
+)
+from turtle_toolkit.modules.data_memory import MEMORY_LATENCY_CYCLES
+from turtle_toolkit.modules.decoder import DecodeUnit
+from turtle_toolkit.modules.instruction_memory import (
+    INSTRUCTION_FETCH_LATENCY_CYCLES,
+    InstructionBinary,
+)
+
+from .binary_macros import INSTRUCTION_HALT
+
+
+@pytest.fixture
+def decoder():
+    return DecodeUnit("test_decoder")
+
+
+def _program(decoder, source):
+    binary = Assembler.assemble(source)
+    program = [None] * (1 << INSTRUCTION_ADDRESS_WIDTH)
+    for address in range(0, len(binary), 2):
+        decoded = decoder.decode(InstructionBinary(binary[address : address + 2]))
+        program[address] = encode_instruction(decoded)
+    return program
+
+
+def _run(program, registers=None, max_cycles=None):
+    registers = registers if registers is not None else [0] * NUM_REGISTERS
+    data_memory = bytearray(1 << DATA_ADDRESS_WIDTH)
+    data_written = bytearray(1 << DATA_ADDRESS_WIDTH)
+    cycles, pc = run_kernel(
+        registers,
+        data_memory,
+        data_written,
+        program,
+        0,
+        max_cycles,
+        INSTRUCTION_FETCH_LATENCY_CYCLES,
+        MEMORY_LATENCY_CYCLES,
+    )
+    return cycles, pc, registers, data_memory, data_written
+
+
+def test_memory_instruction_cycles():
+    assert memory_instruction_cycles(10, 10) == 22
+    assert memory_instruction_cycles(10, 0) == 11
+    assert memory_instruction_cycles(0, 3) == 4
+    assert memory_instruction_cycles(2, 7) == 12
+
+
+def test_halt_is_not_encoded(decoder):
+    decoded = decoder.decode(InstructionBinary(INSTRUCTION_HALT))
+    assert encode_instruction(decoded) is None
+
+
+def test_put_acc_is_not_encoded(decoder):
+    decoded = decoder.decode(InstructionBinary(Assembler.assemble("PUT ACC")))
+    assert encode_instruction(decoded) is None
+
+
+def test_run_until_halt(decoder):
+    program = _program(decoder, "SET 0xFF\nADDI 2\nPUT R0\nHALT")
+    cycles, pc, registers, _, _ = _run(program)
+    assert cycles == 3 * (INSTRUCTION_FETCH_LATENCY_CYCLES + 1)
+    assert pc == 6
+    assert registers[RegisterIndex.R0.value] == 1
+    # Carry set, result positive and non-zero
+    assert registers[RegisterIndex.STATUS.value] == 0b0110
+
+
+def test_store_and_load(decoder):
+    program = _program(decoder, "SET 7\nSTORE\nSET 0\nLOAD\nHALT")
+    cycles, pc, registers, data_memory, data_written = _run(program)
+    memory_cycles = memory_instruction_cycles(
+        INSTRUCTION_FETCH_LATENCY_CYCLES, MEMORY_LATENCY_CYCLES
+    )
+    assert cycles == 2 * (INSTRUCTION_FETCH_LATENCY_CYCLES + 1) + 2 * memory_cycles
+    assert pc == 8
+    assert registers[RegisterIndex.ACC.value] == 7
+    assert data_memory[0] == 7
+    assert data_written[0] == 1
+
+
+def test_load_from_unwritten_address_stops(decoder):
+    program = _program(decoder, "SET 1\nLOAD\nHALT")
+    cycles, pc, registers, _, _ = _run(program)
+    assert cycles == INSTRUCTION_FETCH_LATENCY_CYCLES + 1
+    assert pc == 2
+
+
+def test_stops_before_exceeding_max_cycles(decoder):
+    program = _program(decoder, "SET 1\nADDI 1\nADDI 1\nHALT")
+    cycles, pc, registers, _, _ = _run(
+        program, max_cycles=2 * (INSTRUCTION_FETCH_LATENCY_CYCLES + 1) + 3
+    )
+    assert cycles == 2 * (INSTRUCTION_FETCH_LATENCY_CYCLES + 1)
+    assert pc == 4
+    assert registers[RegisterIndex.ACC.value] == 2
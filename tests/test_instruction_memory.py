@@ -123,3 +123,17 @@ def test_fetch_without_pending_request(instruction_memory):
     with pytest.raises(ValueError) as excinfo:
         instruction_memory.get_fetch_result()
     assert "No read operation pending." == str(excinfo.value)
+
+
+def test_peek(instruction_memory):
+    """Test reading instructions without waiting for a fetch"""
+    instruction1 = b"\x00" * (INSTRUCTION_WIDTH // 8)
+    instruction2 = b"\xff" * (INSTRUCTION_WIDTH // 8)
+    instruction_memory.side_load(instruction1 + instruction2)
+
+    result = instruction_memory.peek(InstructionAddressBusValue(INSTRUCTION_WIDTH // 8))
+    assert result is not None
+    assert result.data == instruction2
+    assert instruction_memory.state.pending_address is None
+    assert instruction_memory.state.remaining_cycles is None
+    assert instruction_memory.peek(InstructionAddressBusValue(0x100)) is None
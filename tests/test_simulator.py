@@ -1,5 +1,6 @@
 import pytest
 
+from turtle_toolkit import simulator as simulator_module
 from turtle_toolkit.assembler import Assembler
 from turtle_toolkit.common.config import INSTRUCTION_WIDTH
 from turtle_toolkit.common.data_types import DataAddressBusValue, DataBusValue
@@ -19,10 +20,25 @@ from turtle_toolkit.simulator import (
 def simulator():
     """Provides a fresh simulator instance for each test."""
     sim = Simulator()
+    sim.set_memory_model(always_ready=False)
     sim.reset()
     return sim
 
 
+def test_singleton_instance(simulator):
+    # Test that the simulator is shared and bound at module level
+    assert Simulator() is simulator
+    assert simulator_module.SIM is simulator
+
+
+def test_typed_module_states(simulator):
+    # Test that the typed state references match the module state dictionary
+    state = simulator.get_state()
+    assert state.instr_mem_state is state.modules[INSTRUCTION_MEMORY_NAME]
+    assert state.data_mem_state is state.modules[DATA_MEMORY_NAME]
+    assert state.reg_file_state is state.modules[REGISTER_FILE_NAME]
+
+
 def test_initial_state(simulator):
     # Test the initial state of the simulator
     state = simulator.get_state()
@@ -92,6 +108,45 @@ def test_load_program(simulator):
     ] == DataBusValue(1)
 
 
+def test_load_binary_string_file(simulator, tmp_path):
+    # Test loading a binary string file with comments and mixed whitespace
+    binary = Assembler.assemble("SET 1\nHALT")
+    bits = [format(byte, "08b") for byte in binary]
+    file_path = tmp_path / "program.binstr.txt"
+    file_path.write_text(
+        f"// Program\n{bits[0]} {bits[1]}  // SET 1\n\t{''.join(bits[2:])}\n"
+    )
+    simulator.load_binary_string_file(str(file_path))
+    simulator.run_until_halt()
+    state = simulator.get_state()
+    assert state.modules[REGISTER_FILE_NAME].registers[
+        RegisterIndex.ACC
+    ] == DataBusValue(1)
+
+
+def test_load_binary_string_file_invalid_characters(simulator, tmp_path):
+    # Test that characters other than binary digits are rejected
+    file_path = tmp_path / "program.binstr.txt"
+    file_path.write_text("01000100 0000000x\n")
+    with pytest.raises(ValueError, match="Invalid characters"):
+        simulator.load_binary_string_file(str(file_path))
+
+
+def test_load_binary_replaces_decoded_program(simulator):
+    # Test that reloading a program does not reuse previously decoded instructions
+    simulator.load_binary(Assembler.assemble("SET 1\nJMPI -2"))
+    cycles_per_instruction = 1 + INSTRUCTION_FETCH_LATENCY_CYCLES
+    for _ in simulator.run(4 * cycles_per_instruction):
+        pass
+    simulator.load_binary(Assembler.assemble("SET 2\nHALT"))
+    simulator.run_until_halt(max_cycles=1000)
+    state = simulator.get_state()
+    assert state.halted
+    assert state.modules[REGISTER_FILE_NAME].registers[
+        RegisterIndex.ACC
+    ] == DataBusValue(2)
+
+
 def test_addi_instruction(simulator):
     # Test the ADD instruction
     source = """
@@ -565,6 +620,200 @@ def test_watchdog_timer(simulator):
     assert excinfo.value.cycle_count == max_cycles
 
 
+def test_watchdog_timer_inside_block(simulator):
+    # Test that a cycle limit falling inside a block stops at the exact cycle
+    source = """
+    SET 1
+    ADDI 1
+    ADDI 1
+    ADDI 1
+    ADDI 1
+    JMPI 0
+    """
+    binary = Assembler.assemble(source)
+    simulator.load_binary(binary)
+    cycles_per_instruction = 1 + INSTRUCTION_FETCH_LATENCY_CYCLES
+    max_cycles = 3 * cycles_per_instruction + 5
+
+    with pytest.raises(SimulationTimeout) as excinfo:
+        simulator.run_until_halt(max_cycles=max_cycles)
+
+    assert excinfo.value.cycle_count == max_cycles
+    state = simulator.get_state()
+    assert state.stalled
+    assert state.modules[REGISTER_FILE_NAME].registers[
+        RegisterIndex.ACC
+    ] == DataBusValue(3)
+
+
+def test_run_resumes_inside_block(simulator):
+    # Test that stepping part way into a block and resuming matches a full run
+    source = """
+    SET 1
+    PUT R0
+    ADDI 2
+    PUT R1
+    HALT
+    """
+    binary = Assembler.assemble(source)
+    num_instructions = len(binary) // (INSTRUCTION_WIDTH // 8)
+    simulator.load_binary(binary)
+    for _ in simulator.run(7):
+        pass
+    assert simulator.get_state().cycle_count == 7
+    simulator.run_until_halt()
+    state = simulator.get_state()
+    assert state.cycle_count == num_instructions * (
+        1 + INSTRUCTION_FETCH_LATENCY_CYCLES
+    )
+    assert state.modules[REGISTER_FILE_NAME].registers[
+        RegisterIndex.R0
+    ] == DataBusValue(1)
+    assert state.modules[REGISTER_FILE_NAME].registers[
+        RegisterIndex.R1
+    ] == DataBusValue(3)
+
+
+def test_halt_ends_block(simulator):
+    # Test that a block ending in a halt stops at the halting cycle
+    source = """
+    SET 1
+    ADDI 1
+    PUT R0
+    HALT
+    """
+    binary = Assembler.assemble(source)
+    num_instructions = len(binary) // (INSTRUCTION_WIDTH // 8)
+    simulator.load_binary(binary)
+    max_cycles = num_instructions * (1 + INSTRUCTION_FETCH_LATENCY_CYCLES)
+
+    result = simulator.run_until_halt(max_cycles=max_cycles)
+
+    assert result.cycle_count == max_cycles
+    assert result.state.halted
+    assert result.state.modules[REGISTER_FILE_NAME].registers[
+        RegisterIndex.R0
+    ] == DataBusValue(2)
+
+
+def test_run_matches_run_until_halt(simulator):
+    # Test that stepping with the generator ends in the same state as a full run
+    source = """
+    SET 3
+    PUT R0
+    STORE
+    GET R0
+    SUBI 1
+    PUT R0
+    BNZ -6
+    LOAD
+    HALT
+    """
+    binary = Assembler.assemble(source)
+    simulator.load_binary(binary)
+    result = simulator.run_until_halt(max_cycles=10000)
+    expected_registers = dict(result.state.modules[REGISTER_FILE_NAME].registers)
+
+    simulator.reset()
+    simulator.load_binary(binary)
+    gen = simulator.run(10000)
+    with pytest.raises(StopIteration) as excinfo:
+        while True:
+            next(gen)
+    assert excinfo.value.value.cycle_count == result.cycle_count
+    state = simulator.get_state()
+    assert state.halted
+    assert state.modules[REGISTER_FILE_NAME].registers == expected_registers
+
+
+@pytest.mark.parametrize("max_cycles", [None, 150, 10000])
+def test_run_until_halt_use_fast(simulator, max_cycles):
+    # Test that the fast kernel ends in the same state as the regular simulation
+    source = """
+    SET 3
+    PUT R0
+    GET R0
+    PUT DOFF
+    STORE
+    ADDI 0xFE
+    LOAD
+    XOR R0
+    PUT R1
+    GET R0
+    SUBI 1
+    PUT R0
+    BNZ -20
+    HALT
+    """
+    binary = Assembler.assemble(source)
+
+    def run(use_fast):
+        simulator.reset()
+        simulator.load_binary(binary)
+        try:
+            simulator.run_until_halt(max_cycles=max_cycles, use_fast=use_fast)
+        except SimulationTimeout:
+            pass
+        state = simulator.get_state()
+        return (
+            state.cycle_count,
+            state.halted,
+            state.stalled,
+            dict(state.modules[REGISTER_FILE_NAME].registers),
+            dict(state.modules[DATA_MEMORY_NAME].memory),
+            state.modules[PROGRAM_COUNTER_NAME].value,
+        )
+
+    assert run(use_fast=True) == run(use_fast=False)
+
+
+def test_use_fast_load_from_unwritten_address(simulator):
+    # Test that the fast kernel leaves faults to the regular simulation
+    source = """
+    SET 1
+    LOAD
+    HALT
+    """
+    simulator.load_program(source)
+    with pytest.raises(ValueError) as excinfo:
+        simulator.run_until_halt(use_fast=True)
+    assert "Segmentation fault" in str(excinfo.value)
+
+
+@pytest.mark.parametrize("use_fast", [False, True])
+def test_always_ready_memory_model(simulator, use_fast):
+    # Test that every instruction takes one cycle when memories are always ready
+    source = """
+    SET 5
+    PUT DOFF
+    STORE
+    SET 0
+    LOAD
+    ADDI 1
+    HALT
+    """
+    simulator.set_memory_model(always_ready=True)
+    simulator.load_program(source)
+    result = simulator.run_until_halt(max_cycles=100, use_fast=use_fast)
+    assert result.cycle_count == 7
+    state = simulator.get_state()
+    assert state.modules[REGISTER_FILE_NAME].registers[
+        RegisterIndex.ACC
+    ] == DataBusValue(6)
+    assert state.modules[DATA_MEMORY_NAME].memory[
+        DataAddressBusValue(0x005)
+    ] == DataBusValue(5)
+
+
+def test_always_ready_load_from_unwritten_address(simulator):
+    # Test that loads still fault when memories are always ready
+    simulator.set_memory_model(always_ready=True)
+    simulator.load_program("SET 1\nLOAD\nHALT")
+    with pytest.raises(ValueError) as excinfo:
+        simulator.run_until_halt(max_cycles=100)
+    assert "Segmentation fault" in str(excinfo.value)
+
+
 def test_store_instruction(simulator):
     # Test the STORE instruction
     source = """